@@ -1,10 +1,23 @@
 import sys, os
 sys.path.append(os.path.dirname(__file__))
-import flask
+import functools
+import base64
+import datetime as dt
+import hashlib
+import re
+import threading
+import time
 import traceback
-from flask import Flask, jsonify, request
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+import httpx
+import orjson
+from cachetools import TLRUCache, TTLCache
+from flask import Flask, g, request
+from flask_compress import Compress
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
 from common.airports import get_tz
 
 # Load .env locally; on Render env vars come from the dashboard
@@ -24,160 +37,438 @@ ALLOW_ALL = ALLOWED_ORIGIN == "*"
 if not SUPABASE_URL or not SUPABASE_KEY:
     print("❌ Missing SUPABASE_URL or SUPABASE_KEY in environment.", file=sys.stderr)
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
+# Size the PostgREST connection pool for concurrent workers instead of httpx's defaults.
+# Only the postgrest sub-client is used here (it rebinds base_url/headers on this client).
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "60"))
+_http_client = httpx.Client(
+    limits=httpx.Limits(
+        max_connections=SUPABASE_MAX_CONNECTIONS,
+        max_keepalive_connections=max(1, SUPABASE_MAX_CONNECTIONS * 2 // 3),
+        keepalive_expiry=60.0,
+    ),
+    timeout=httpx.Timeout(10.0, connect=3.0),
+    transport=httpx.HTTPTransport(retries=3, http2=True),
+    follow_redirects=True,
+)
+
+supabase: Client = (
+    create_client(SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(httpx_client=_http_client))
+    if SUPABASE_URL and SUPABASE_KEY else None
+)
 
 app = Flask(__name__)
 
+# Short-lived in-process cache of serialized /api/flights bodies, keyed by query args.
+# Data is a snapshot refreshed by the scraper, so a few seconds of staleness is fine.
+FLIGHTS_CACHE_TTL_S = int(os.getenv("FLIGHTS_CACHE_TTL_S", "30"))
+# pending flights flip to available as soon as a price appears, keep them fresher
+PENDING_CACHE_TTL_S = int(os.getenv("PENDING_CACHE_TTL_S", "5"))
+# Entries are (etag, body, next_cursor, expires_at) and expire at their own deadline
+# (time.monotonic), so pending listings and copies of Redis hits keep their shorter TTL.
+_flights_cache: TLRUCache = TLRUCache(maxsize=256, ttu=lambda _key, entry, _now: entry[3])
+_flights_cache_lock = threading.RLock()
+
+# Optional shared cache across workers/instances; only used when REDIS_URL is set.
+REDIS_URL = os.getenv("REDIS_URL")
+_redis = None
+if REDIS_URL:
+    import redis
+    _redis = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+def _redis_key(filters) -> str:
+    return "flights:v2:" + hashlib.blake2b(repr(filters).encode("utf-8"), digest_size=16).hexdigest()
+
+def _cache_ttl(filters) -> int:
+    return PENDING_CACHE_TTL_S if filters.status == "pending" else FLIGHTS_CACHE_TTL_S
+
+def _redis_get(filters) -> Optional[tuple]:
+    """
+    Return (etag, body, next_cursor, expires_at) from Redis, or None on miss/outage
+    (Redis is best-effort). expires_at carries over the key's remaining TTL.
+    """
+    if _redis is None:
+        return None
+    key = _redis_key(filters)
+    try:
+        raw, ttl_ms = _redis.pipeline(transaction=False).get(key).pttl(key).execute()
+    except Exception as e:
+        print(f"⚠️  Redis get failed: {e}", file=sys.stderr)
+        return None
+    if not raw:
+        return None
+    etag, _, rest = raw.partition(b"\n")
+    next_cursor, _, body = rest.partition(b"\n")
+    # pttl is -1 (no expiry) / -2 (gone) in edge cases: fall back to the full TTL
+    remaining = ttl_ms / 1000 if ttl_ms > 0 else _cache_ttl(filters)
+    return etag.decode("ascii"), body, next_cursor.decode("ascii") or None, time.monotonic() + remaining
+
+def _redis_set(filters, etag: str, body: bytes, next_cursor: Optional[str]) -> None:
+    if _redis is None:
+        return
+    try:
+        value = b"\n".join((etag.encode("ascii"), (next_cursor or "").encode("ascii"), body))
+        _redis.setex(_redis_key(filters), _cache_ttl(filters), value)
+    except Exception as e:
+        print(f"⚠️  Redis set failed: {e}", file=sys.stderr)
+
+class _CompressedBodyCache:
+    """
+    Flask-Compress cache backend. Keys are "<algo>;<etag>", and the ETag is a hash
+    of the uncompressed body, so an entry can never go stale; requests without an
+    ETag (empty key suffix) are not cached.
+    """
+    def __init__(self) -> None:
+        self._data: TTLCache = TTLCache(maxsize=512, ttl=FLIGHTS_CACHE_TTL_S)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        if key.endswith(";"):
+            return
+        with self._lock:
+            self._data[key] = value
+
+# Registered before the CORS hooks so it runs after them and sees the final headers
+app.config.update(
+    COMPRESS_MIMETYPES=["application/json"],
+    COMPRESS_ALGORITHM=["br", "gzip"],
+    COMPRESS_LEVEL=5,
+    COMPRESS_MIN_SIZE=1024,
+    COMPRESS_CACHE_BACKEND=_CompressedBodyCache,
+    COMPRESS_CACHE_KEY=lambda req: g.get("body_etag", ""),
+)
+Compress(app)
+
+def ojsonify(obj, status: int = 200):
+    """Like flask.jsonify, but serializes with orjson (much faster on large row lists)."""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype="application/json")
+
+ALLOWED_ORIGINS_SET = frozenset(ALLOWED_ORIGINS)
+_CORS_STATIC = {
+    "Access-Control-Allow-Methods": "GET, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+    "Access-Control-Expose-Headers": "X-Next-Cursor",
+}
+
+def _apply_cors(resp, origin: str):
+    resp.headers.update(_CORS_STATIC)
+    if ALLOW_ALL:
+        resp.headers["Access-Control-Allow-Origin"] = "*"
+        return resp
+    # vary on Origin even when it didn't match: /api/flights is publicly cacheable,
+    # and a shared cache must not replay a header-less reply to allowed origins
+    resp.vary.add("Origin")
+    if origin in ALLOWED_ORIGINS_SET:
+        resp.headers["Access-Control-Allow-Origin"] = origin
+    return resp
+
 # Handle CORS for preflight and responses
 @app.before_request
 def handle_preflight():
-    if flask.request.method == "OPTIONS":
-        resp = app.make_default_options_response()
-        origin = (flask.request.headers.get("Origin") or "").rstrip("/")
+    # Preflight is a constant empty reply; add_cors_headers fills in the CORS headers.
+    # Unknown paths have no url_rule: fall through so they still 404.
+    if request.method == "OPTIONS" and request.url_rule is not None:
+        return app.response_class(status=204)
+
+@app.after_request
+def add_cors_headers(resp):
+    # read the raw WSGI environ: one dict lookup instead of EnvironHeaders' case-insensitive scan
+    if request.endpoint == "healthz":
+        return resp  # probed by Render, never by browsers
+    origin = request.environ.get("HTTP_ORIGIN")
+    if not origin:
+        # Non-browser caller: skip the method/header set, but keep responses that a
+        # shared cache may store valid for later browser requests.
         if ALLOW_ALL:
             resp.headers["Access-Control-Allow-Origin"] = "*"
-        elif origin in ALLOWED_ORIGINS:
-            resp.headers["Access-Control-Allow-Origin"] = origin
-            resp.headers["Vary"] = "Origin"
-        resp.headers["Access-Control-Allow-Methods"] = "GET, OPTIONS"
-        resp.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+        else:
+            resp.vary.add("Origin")
         return resp
+    return _apply_cors(resp, origin.rstrip("/"))
 
-@app.after_request
-def add_cors_headers(resp):
-    origin = (flask.request.headers.get("Origin") or "").rstrip("/")
-    if ALLOW_ALL:
-        resp.headers["Access-Control-Allow-Origin"] = "*"
-    elif origin in ALLOWED_ORIGINS:
-        resp.headers["Access-Control-Allow-Origin"] = origin
-        resp.headers["Vary"] = "Origin"
-    resp.headers["Access-Control-Allow-Methods"] = "GET, OPTIONS"
-    resp.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
-    return resp
+_INDEX_BODY = (
+    "<h1>JetCheck API</h1>"
+    "<p>Welcome! The API is running.</p>"
+    "<h2>Endpoints:</h2>"
+    "<ul>"
+    "  <li><a href='/api/flights'>/api/flights</a> (uses flights_public)</li>"
+    "  <li><a href='/healthz'>/healthz</a></li>"
+    "</ul>"
+)
+_INDEX_HEADERS = {"Content-Type": "text/html; charset=utf-8", "Cache-Control": "public, max-age=3600"}
+
+# env is fixed at boot, so the health payload is too
+_OK_ENV = bool(SUPABASE_URL) and bool(SUPABASE_KEY)
+_HEALTH_BODY = b'{"ok":true}' if _OK_ENV else b'{"ok":false}'
+_HEALTH_STATUS = 200 if _OK_ENV else 500
 
 @app.route("/")
 def index():
-    return (
-        "<h1>JetCheck API</h1>"
-        "<p>Welcome! The API is running.</p>"
-        "<h2>Endpoints:</h2>"
-        "<ul>"
-        "  <li><a href='/api/flights'>/api/flights</a> (uses flights_public)</li>"
-        "  <li><a href='/healthz'>/healthz</a></li>"
-        "</ul>"
-    ), 200, {"Content-Type": "text/html; charset=utf-8"}
+    return _INDEX_BODY, 200, _INDEX_HEADERS
 
 @app.route("/healthz")
 def healthz():
-    ok_env = bool(SUPABASE_URL) and bool(SUPABASE_KEY)
-    status_code = 200 if ok_env else 500
-    return jsonify({"ok": ok_env}), status_code
+    return app.response_class(_HEALTH_BODY, status=_HEALTH_STATUS, mimetype="application/json")
+
+def _etag_matches(etag: str) -> bool:
+    # Flask-Compress sends "<etag>:<algo>", so accept that form back as well
+    inm = request.if_none_match
+    return inm.contains(etag) or any(t.partition(":")[0] == etag for t in inm.as_set())
+
+# Browsers/CDNs may reuse a listing for the cache TTL and serve it stale while they
+# revalidate; pending flights flip to available as soon as a price appears, so never store those.
+_CACHE_CONTROL_PUBLIC = f"public, max-age={FLIGHTS_CACHE_TTL_S}, stale-while-revalidate={2 * FLIGHTS_CACHE_TTL_S}"
+_CACHE_CONTROL_PENDING = "no-store"
+
+def _flights_response(etag: str, body: bytes, next_cursor: Optional[str] = None,
+                      cache_control: str = _CACHE_CONTROL_PUBLIC):
+    # Polling clients send back the ETag; skip the body entirely when unchanged
+    if _etag_matches(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype="application/json")
+        g.body_etag = etag
+    response.set_etag(etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+# Column sets selectable via ?fields=. "full" is what the flight cards render;
+# "minimal" is a compact list view (roughly half the payload).
+_FIELD_SETS = {
+    "full": (
+        "id,source,origin_iata,origin_name,origin_tz,"
+        "destination_iata,destination_name,destination_tz,"
+        "departure_ts,arrival_ts,aircraft,"
+        "price_current,"
+        "status_latest,link_latest,last_seen_at,"
+        "canonical_hash,origin_lat,origin_lon,destination_lat,destination_lon,discount_percent,price_normal"
+    ),
+    "minimal": "id,origin_iata,destination_iata,departure_ts,price_current,link_latest,status_latest",
+}
+
+# Validated filter vocabularies; anything else falls back to the default
+_SORT_COLS = {
+    "departure_ts": "departure_ts",
+    "price_current": "price_current",
+    "last_seen_at": "last_seen_at",
+}
+_STATUSES = frozenset({"available", "pending"})
+
+@dataclass(frozen=True, slots=True)
+class FlightFilters:
+    """Parsed /api/flights query args; hashable, so it doubles as the response cache key."""
+    fields: str
+    origin: str
+    dest: str
+    status: str
+    aircraft: str
+    date_exact: str
+    date_from: str
+    date_to: str
+    max_price: Optional[float]
+    min_discount: Optional[float]
+    sort_col: str
+    desc: bool
+    page: int
+    page_size: int
+    cursor: Optional[Tuple[str, str]]  # (departure_ts, id) of the last row already seen
+
+def _encode_cursor(departure_ts: str, row_id) -> str:
+    return base64.urlsafe_b64encode(f"{departure_ts}|{row_id}".encode("utf-8")).decode("ascii")
+
+# ts is pasted into a PostgREST or_() filter, so only a strict ISO-8601 form passes
+# (fromisoformat alone accepts any separator char, e.g. '"', which breaks the quoting)
+_CURSOR_TS_RE = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})")
+
+def _decode_cursor(raw: str) -> Optional[Tuple[str, str]]:
+    """Decode and validate a keyset cursor; anything malformed means "no cursor"."""
+    if not raw:
+        return None
+    try:
+        ts, _, row_id = base64.urlsafe_b64decode(raw.encode("ascii")).decode("utf-8").partition("|")
+        if not _CURSOR_TS_RE.fullmatch(ts):
+            return None
+        dt.datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if not row_id or not all(ch.isalnum() or ch == "-" for ch in row_id):
+        return None
+    return ts, row_id
+
+def _arg(args: Dict[str, str], name: str) -> str:
+    """Stripped query value; '' when absent or blank."""
+    v = args.get(name)
+    return v.strip() if v else ""
+
+def _float_or_none(v: str) -> Optional[float]:
+    if not v:
+        return None
+    try:
+        return float(v)
+    except ValueError:
+        return None
+
+@functools.lru_cache(maxsize=1024)
+def _parse_filters(qs: str) -> FlightFilters:
+    """Parse a raw query string once; dashboards poll with the same few strings."""
+    args: Dict[str, str] = {}
+    for k, v in parse_qsl(qs, keep_blank_values=True):
+        args.setdefault(k, v)  # first value wins, like request.args.get
+
+    fields = _arg(args, "fields")
+    status = _arg(args, "status").lower()
+
+    try:
+        page = max(1, int(_arg(args, "page") or "1"))
+    except ValueError:
+        page = 1
+    try:
+        page_size = max(1, min(500, int(_arg(args, "page_size") or "100")))
+    except ValueError:
+        page_size = 100
+
+    sort_col = _SORT_COLS.get(_arg(args, "sort_key"), "departure_ts")
+
+    return FlightFilters(
+        fields=fields if fields in _FIELD_SETS else "full",
+        origin=_arg(args, "from").upper(),
+        dest=_arg(args, "to").upper(),
+        status=status if status in _STATUSES else "",
+        aircraft=_arg(args, "aircraft"),
+        date_exact=_arg(args, "date"),
+        date_from=_arg(args, "date_from"),
+        date_to=_arg(args, "date_to"),
+        max_price=_float_or_none(_arg(args, "max_price")),
+        min_discount=_float_or_none(_arg(args, "min_discount")),
+        sort_col=sort_col,
+        desc=_arg(args, "sort_dir").lower() == "desc",
+        page=page,
+        page_size=page_size,
+        # keyset cursors are only defined for the (departure_ts, id) ordering
+        cursor=_decode_cursor(_arg(args, "cursor")) if sort_col == "departure_ts" else None,
+    )
+
+# (FlightFilters attribute, column, PostgREST operator); unset ("" / None) values are skipped
+_FILTER_SPECS = (
+    ("origin", "origin_iata", "eq"),
+    ("dest", "destination_iata", "eq"),
+    ("status", "status_latest", "eq"),
+    ("aircraft", "aircraft", "eq"),
+    ("max_price", "price_current", "lte"),
+    ("min_discount", "discount_percent", "gte"),
+)
+
+@functools.lru_cache(maxsize=1024)
+def _filter_triples(filters: FlightFilters) -> Tuple[Tuple[str, str, object], ...]:
+    """(column, operator, criteria) for every active filter, computed once per filter set."""
+    out = [
+        (column, operator, value)
+        for attr, column, operator in _FILTER_SPECS
+        if (value := getattr(filters, attr)) not in ("", None)
+    ]
+    # single date or date range, compared by day range (UTC)
+    date_from = filters.date_exact or filters.date_from
+    date_to = filters.date_exact or filters.date_to
+    if date_from:
+        out.append(("departure_ts", "gte", f"{date_from}T00:00:00Z"))
+    if date_to:
+        out.append(("departure_ts", "lte", f"{date_to}T23:59:59Z"))
+    return tuple(out)
+
+def _execute_raw(q) -> bytes:
+    """
+    Run a built postgrest query and return PostgREST's JSON body as-is, skipping
+    the SDK's decode into APIResponse (and our re-encode) on the hot path.
+    """
+    r = q.session.request(q.http_method, q.path, params=q.params, headers=q.headers)
+    if not r.is_success:
+        raise RuntimeError(f"PostgREST {r.status_code}: {r.text[:300]}")
+    return r.content
 
 # Unified endpoint backed by the 'flights_public' view
 @app.route("/api/flights", methods=["GET", "OPTIONS"])
 def get_flights():
     if supabase is None:
-        return jsonify({"error": "Supabase client not configured"}), 500
+        return ojsonify({"error": "Supabase client not configured"}, 500)
+
+    filters = _parse_filters(request.query_string.decode("utf-8", "replace"))
+    cache_control = _CACHE_CONTROL_PENDING if filters.status == "pending" else _CACHE_CONTROL_PUBLIC
+    with _flights_cache_lock:
+        cached = _flights_cache.get(filters)
+    if cached is None:
+        cached = _redis_get(filters)
+        if cached is not None:
+            with _flights_cache_lock:
+                _flights_cache[filters] = cached
+    if cached is not None:
+        return _flights_response(*cached[:3], cache_control=cache_control)
+
     try:
-        q = supabase.table("flights_public").select(
-            "id,source,origin_iata,origin_name,origin_tz,"
-            "destination_iata,destination_name,destination_tz,"
-            "departure_ts,arrival_ts,aircraft,"
-            "price_current,"
-            "status_latest,link_latest,last_seen_at,"
-            "canonical_hash,origin_lat,origin_lon,destination_lat,destination_lon,origin_tz, destination_tz, discount_percent, price_normal"
-        )
+        # count=None: never trigger a COUNT(*) round-trip alongside the page query
+        q = supabase.table("flights_public").select(_FIELD_SETS[filters.fields], count=None)
 
         # --- filters (all optional) ---
-        origin = (request.args.get("from") or "").strip().upper()
-        dest   = (request.args.get("to") or "").strip().upper()
-        status = (request.args.get("status") or "").strip().lower()
-        aircraft = (request.args.get("aircraft") or "").strip()
-
-        if origin:
-            q = q.eq("origin_iata", origin)
-        if dest:
-            q = q.eq("destination_iata", dest)
-        if status in ("available", "pending"):
-            q = q.eq("status_latest", status)
-        if aircraft:
-            q = q.eq("aircraft", aircraft)
-
-        # single date or date range
-        date_exact = (request.args.get("date") or "").strip()
-        date_from  = (request.args.get("date_from") or "").strip()
-        date_to    = (request.args.get("date_to") or "").strip()
-
-        if date_exact:
-            # compare by day range (UTC)
-            q = q.gte("departure_ts", f"{date_exact}T00:00:00Z") \
-                 .lte("departure_ts", f"{date_exact}T23:59:59Z")
-        else:
-            if date_from:
-                q = q.gte("departure_ts", f"{date_from}T00:00:00Z")
-            if date_to:
-                q = q.lte("departure_ts", f"{date_to}T23:59:59Z")
-
-        # price / discount
-        max_price = request.args.get("max_price")
-        min_disc  = request.args.get("min_discount")
-        try:
-            if max_price is not None and max_price != "":
-                q = q.lte("price_current", float(max_price))
-        except ValueError:
-            pass
-        try:
-            if min_disc is not None and min_disc != "":
-                q = q.gte("discount_percent", float(min_disc))
-        except ValueError:
-            pass
+        for column, operator, criteria in _filter_triples(filters):
+            q = q.filter(column, operator, criteria)
 
         # --- sorting ---
-        sort_key = request.args.get("sort_key", "departure_ts")
-        sort_dir = request.args.get("sort_dir", "asc").lower()
-        sort_key_map = {
-            "departure_ts": "departure_ts",
-            "price_current": "price_current",
-            "last_seen_at": "last_seen_at",
-        }
-        col = sort_key_map.get(sort_key, "departure_ts")
-        asc = (sort_dir != "desc")
-        q = q.order(col, desc=not asc, nullsfirst=False)
-
-        # --- pagination ---
-        page = request.args.get("page", "1")
-        page_size = request.args.get("page_size", "100")
-        try:
-            page = max(1, int(page))
-        except ValueError:
-            page = 1
-        try:
-            page_size = max(1, min(500, int(page_size)))
-        except ValueError:
-            page_size = 100
-        start = (page - 1) * page_size
-        end = start + page_size - 1
-        q = q.range(start, end)
-
-        resp = q.execute()
-        out = resp.data or []
-        for row in out:
-            if not row.get("origin_tz"):
-                row["origin_tz"] = get_tz(row["origin_iata"])
-            if not row.get("destination_tz"):
-                row["destination_tz"] = get_tz(row["destination_iata"])
-
-        # make responses explicitly non-cacheable (optional)
-        response = jsonify(out)
-        response.headers["Cache-Control"] = "no-store"
-        return response
+        q = q.order(filters.sort_col, desc=filters.desc, nullsfirst=False)
+        keyset = filters.sort_col == "departure_ts"
+        if keyset:
+            q = q.order("id", desc=filters.desc)  # stable tiebreaker for cursors
+
+        # --- pagination: keyset after ?cursor=, else page/page_size offsets ---
+        if filters.cursor:
+            ts, last_id = filters.cursor
+            op = "lt" if filters.desc else "gt"
+            q = q.or_(f'departure_ts.{op}."{ts}",and(departure_ts.eq."{ts}",id.{op}.{last_id})')
+            q = q.limit(filters.page_size)
+        else:
+            start = (filters.page - 1) * filters.page_size
+            end = start + filters.page_size - 1
+            q = q.range(start, end)
+
+        body = _execute_raw(q)
+        out = None
+        if filters.fields == "full":
+            # backfill missing timezones from the airports index
+            out = orjson.loads(body)
+            patched = False
+            for row in out:
+                if not row.get("origin_tz"):
+                    row["origin_tz"] = get_tz(row["origin_iata"])
+                    patched = True
+                if not row.get("destination_tz"):
+                    row["destination_tz"] = get_tz(row["destination_iata"])
+                    patched = True
+            if patched:
+                body = orjson.dumps(out)
+
+        next_cursor = None
+        if keyset:
+            if out is None:
+                out = orjson.loads(body)
+            last = out[-1] if len(out) == filters.page_size else None
+            if last and last.get("departure_ts") and last.get("id") is not None:
+                next_cursor = _encode_cursor(last["departure_ts"], last["id"])
+
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        with _flights_cache_lock:
+            _flights_cache[filters] = (etag, body, next_cursor, time.monotonic() + _cache_ttl(filters))
+        _redis_set(filters, etag, body, next_cursor)
+        return _flights_response(etag, body, next_cursor, cache_control)
     except Exception as e:
         err = getattr(e, "args", [str(e)])[0]
-        print(f"❌ /api/flights error: {err}", file=sys.stderr)
+        print(f"❌ /api/flights error: {err} ({filters})", file=sys.stderr)
         traceback.print_exc()
         if os.getenv("FLASK_DEBUG", "0") == "1":
-            return jsonify({"error": "Failed to fetch flights", "detail": str(err)}), 500
-        return jsonify({"error": "Failed to fetch flights"}), 500
+            return ojsonify({"error": "Failed to fetch flights", "detail": str(err)}, 500)
+        return ojsonify({"error": "Failed to fetch flights"}, 500)
     
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "5000"))
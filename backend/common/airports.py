@@ -1,55 +1,162 @@
 # backend/common/airports.py
 
 from __future__ import annotations
-import os, unicodedata
-from typing import Dict, Optional, Tuple
+import bisect, functools, hashlib, os, stat, sys, threading, time, unicodedata
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import orjson
 from supabase import create_client, Client
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
+# Local JSON snapshot of the airports table so cold starts skip the Supabase round-trip.
+# Kept in a directory owned by this user (not the shared temp dir), one file per project.
+AIRPORTS_CACHE_DIR = os.getenv("AIRPORTS_CACHE_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "jetcheck"
+)
+AIRPORTS_MAX_AGE = int(os.getenv("AIRPORTS_MAX_AGE", "86400"))
 
 _airport_index_by_iata: Dict[str, Dict] = {}
 _airport_index_by_icao: Dict[str, Dict] = {}
 _airport_index_by_city: Dict[str, Dict] = {}
 _airport_index_by_name: Dict[str, Dict] = {}
+# sorted (key, insertion_index, iata) of the city/name indexes for binary-searched
+# prefix lookups; the index keeps the table-order tie-break of the original scan
+_city_prefix: List[Tuple[str, int, str]] = []
+_name_prefix: List[Tuple[str, int, str]] = []
+# (iata_codes, lats, lons) columns for bulk distance computations
+_latlon_columns: Tuple[List[str], array, array] = ([], array("d"), array("d"))
 _loaded = False
+_load_lock = threading.Lock()
+_client: Optional[Client] = None
+
+def _get_client() -> Client:
+    """One Supabase client per process, so reloads reuse its pooled keep-alive connections."""
+    global _client
+    if _client is None:
+        _client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _client
+
+@functools.lru_cache(maxsize=None)
+def _combining_table() -> Dict[int, None]:
+    """str.translate table deleting all combining marks (built on first use, ~70ms)."""
+    return dict.fromkeys(i for i in range(sys.maxunicode + 1) if unicodedata.combining(chr(i)))
 
+@functools.lru_cache(maxsize=8192)
 def _norm(s: str) -> str:
     if not s:
         return ""
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = unicodedata.normalize("NFKD", s).translate(_combining_table())
     return " ".join(s.strip().lower().split())
 
+def _cache_path() -> Optional[str]:
+    """
+    Snapshot file for the current SUPABASE_URL, or None if caching is off or the
+    cache dir is not a private directory of this user (then we always refetch).
+    """
+    if AIRPORTS_MAX_AGE <= 0 or not SUPABASE_URL:
+        return None
+    try:
+        os.makedirs(AIRPORTS_CACHE_DIR, mode=0o700, exist_ok=True)
+        st = os.stat(AIRPORTS_CACHE_DIR)
+    except OSError:
+        return None
+    # POSIX only: Windows has no getuid and stat() reports no meaningful owner/mode bits;
+    # there the default dir lives under the user's own profile
+    if hasattr(os, "getuid") and (st.st_uid != os.getuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+        return None
+    project = hashlib.blake2b(SUPABASE_URL.encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(AIRPORTS_CACHE_DIR, f"airports-{project}.json")
+
+def _load_cached_rows() -> Optional[List[Dict]]:
+    """Airport rows from the local snapshot, or None if it is missing, stale or unreadable."""
+    path = _cache_path()
+    if path is None:
+        return None
+    try:
+        if time.time() - os.stat(path).st_mtime > AIRPORTS_MAX_AGE:
+            return None
+        with open(path, "rb") as f:
+            rows = orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Airports-Cache unlesbar ({path}): {e}", file=sys.stderr)
+        return None
+    return rows if isinstance(rows, list) else None
+
+def _save_cached_rows(rows: List[Dict]) -> None:
+    """Write the snapshot atomically (tmpfile + rename) so concurrent workers never read a partial file."""
+    path = _cache_path()
+    if path is None:
+        return
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(rows))
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"⚠️ Airports-Cache nicht geschrieben ({path}): {e}", file=sys.stderr)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+def drop_cached_rows() -> None:
+    """Delete the local snapshot (after the airports table changed, e.g. a tz backfill)."""
+    path = _cache_path()
+    if path is None:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
 def build_indexes(force: bool = False) -> None:
+    """(Re)build the lookup indexes; force=True bypasses the local snapshot and refetches."""
+    # serialized so concurrent first requests (threads/greenlets) trigger a single fetch
+    with _load_lock:
+        _build_indexes_locked(force)
+
+def _build_indexes_locked(force: bool) -> None:
     global _loaded, _airport_index_by_iata, _airport_index_by_icao
-    global _airport_index_by_city, _airport_index_by_name
+    global _airport_index_by_city, _airport_index_by_name, _city_prefix, _name_prefix, _latlon_columns
     if _loaded and not force:
         return
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        raise RuntimeError("❌ SUPABASE_URL/SUPABASE_KEY fehlen für Airports-Lookup")
-    client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    rows = (client.table("airports").select("*").execute().data) or []
-
-    _airport_index_by_iata.clear()
-    _airport_index_by_icao.clear()
-    _airport_index_by_city.clear()
-    _airport_index_by_name.clear()
-
-    for row in rows:
-        iata = (row.get("iata") or "").upper()
-        icao = (row.get("icao") or "").upper()
-        city = row.get("city") or ""
-        name = row.get("name") or ""
-        if iata: _airport_index_by_iata[iata] = row
-        if icao: _airport_index_by_icao[icao] = row
-        if city: _airport_index_by_city[_norm(city)] = row
-        if name: _airport_index_by_name[_norm(name)] = row
+    rows = None if force else _load_cached_rows()
+    if rows is None:
+        if not SUPABASE_URL or not SUPABASE_KEY:
+            raise RuntimeError("❌ SUPABASE_URL/SUPABASE_KEY fehlen für Airports-Lookup")
+        rows = (_get_client().table("airports").select("*").execute().data) or []
+        if rows:
+            _save_cached_rows(rows)
+
+    # Build fresh dicts and swap them in (later rows win, as before)
+    upper = str.upper
+    _airport_index_by_iata = {k: r for r in rows if (k := upper(r.get("iata") or ""))}
+    _airport_index_by_icao = {k: r for r in rows if (k := upper(r.get("icao") or ""))}
+    _airport_index_by_city = {_norm(c): r for r in rows if (c := r.get("city"))}
+    _airport_index_by_name = {_norm(n): r for r in rows if (n := r.get("name"))}
+    _city_prefix = _prefix_entries(_airport_index_by_city)
+    _name_prefix = _prefix_entries(_airport_index_by_name)
+    codes: List[str] = []
+    lats, lons = array("d"), array("d")
+    for code, row in _airport_index_by_iata.items():
+        lat, lon = _row_latlon(row)
+        if lat is not None:
+            codes.append(code)
+            lats.append(lat)
+            lons.append(lon)
+    _latlon_columns = (codes, lats, lons)
+    for cached in (_resolve_raw, _to_iata_raw, _to_icao_raw, _to_iata_by_name_raw, _latlon_raw):
+        cached.cache_clear()
 
     _loaded = True
     print(f"✅ Airports-Index: {len(_airport_index_by_iata)} IATA, {len(_airport_index_by_icao)} ICAO")
 
 def _ensure_loaded() -> None:
+    # lock-free fast path; build_indexes re-checks _loaded under the lock
     if not _loaded:
         build_indexes()
 
@@ -57,6 +164,12 @@ def resolve(code_or_name: str) -> Optional[Dict]:
     if not code_or_name:
         return None
     _ensure_loaded()
+    return _resolve_raw(code_or_name)
+
+# Lookups are pure functions of the current indexes, so memoize them per input;
+# build_indexes() clears these caches whenever the indexes are swapped.
+@functools.lru_cache(maxsize=4096)
+def _resolve_raw(code_or_name: str) -> Optional[Dict]:
     s = code_or_name.strip().upper()
     if len(s) == 3 and s in _airport_index_by_iata:
         return _airport_index_by_iata[s]
@@ -73,13 +186,17 @@ def to_iata(code_or_name: str) -> Optional[str]:
     if not code_or_name:
         return None
     _ensure_loaded()
+    return _to_iata_raw(code_or_name)
+
+@functools.lru_cache(maxsize=4096)
+def _to_iata_raw(code_or_name: str) -> Optional[str]:
     s = code_or_name.strip().upper()
     if len(s) == 3 and s in _airport_index_by_iata:
         return s
     if len(s) == 4 and s in _airport_index_by_icao:
         row = _airport_index_by_icao[s]
         return (row.get("iata") or "").upper() or None
-    row = resolve(code_or_name)
+    row = _resolve_raw(code_or_name)
     if row:
         return (row.get("iata") or "").upper() or None
     return None
@@ -88,13 +205,17 @@ def to_icao(code_or_name: str) -> Optional[str]:
     if not code_or_name:
         return None
     _ensure_loaded()
+    return _to_icao_raw(code_or_name)
+
+@functools.lru_cache(maxsize=4096)
+def _to_icao_raw(code_or_name: str) -> Optional[str]:
     s = code_or_name.strip().upper()
     if len(s) == 4 and s in _airport_index_by_icao:
         return s
     if len(s) == 3 and s in _airport_index_by_iata:
         row = _airport_index_by_iata[s]
         return (row.get("icao") or "").upper() or None
-    row = resolve(code_or_name)
+    row = _resolve_raw(code_or_name)
     if row:
         return (row.get("icao") or "").upper() or None
     return None
@@ -105,20 +226,40 @@ def to_names(code_or_name: str) -> Tuple[Optional[str], Optional[str]]:
         return (None, None)
     return (row.get("city"), row.get("name"))
 
+def _prefix_entries(idx: Dict[str, Dict]) -> List[Tuple[str, int, str]]:
+    return sorted((key, i, (row.get("iata") or "").upper()) for i, (key, row) in enumerate(idx.items()))
+
+def _first_prefix_iata(entries: List[Tuple[str, int, str]], n: str) -> Optional[str]:
+    """
+    IATA of the first key in table order that starts with n and has one. Binary search
+    bounds the candidates to the prefix range instead of scanning every key.
+    """
+    best: Optional[Tuple[int, str]] = None
+    i = bisect.bisect_left(entries, (n,))
+    while i < len(entries) and entries[i][0].startswith(n):
+        _, pos, iata = entries[i]
+        if iata and (best is None or pos < best[0]):
+            best = (pos, iata)
+        i += 1
+    return best[1] if best else None
+
 def to_iata_by_name(name: str) -> Optional[str]:
     if not name:
         return None
     _ensure_loaded()
+    return _to_iata_by_name_raw(name)
+
+@functools.lru_cache(maxsize=4096)
+def _to_iata_by_name_raw(name: str) -> Optional[str]:
+    # the substring fallback below scans every key, so repeated names matter most here
     n = _norm(name)
     row = _airport_index_by_city.get(n) or _airport_index_by_name.get(n)
     if row and row.get("iata"):
         return (row["iata"] or "").upper() or None
-    for idx in (_airport_index_by_city, _airport_index_by_name):
-        for key, row in idx.items():
-            if key.startswith(n):
-                iata = (row.get("iata") or "").upper()
-                if iata:
-                    return iata
+    for entries in (_city_prefix, _name_prefix):
+        iata = _first_prefix_iata(entries, n)
+        if iata:
+            return iata
     for idx in (_airport_index_by_city, _airport_index_by_name):
         for key, row in idx.items():
             if n in key:
@@ -132,9 +273,19 @@ def get_latlon(code_or_name: str) -> Tuple[Optional[float], Optional[float]]:
     Returns (lat, lon) for an airport by IATA/ICAO/city/name, or (None, None).
     Accepts common column variants: lat/lon or latitude/longitude/lng.
     """
-    row = resolve(code_or_name)
+    if not code_or_name:
+        return (None, None)
+    _ensure_loaded()
+    return _latlon_raw(code_or_name)
+
+@functools.lru_cache(maxsize=4096)
+def _latlon_raw(code_or_name: str) -> Tuple[Optional[float], Optional[float]]:
+    row = _resolve_raw(code_or_name)
     if not row:
         return (None, None)
+    return _row_latlon(row)
+
+def _row_latlon(row: Dict) -> Tuple[Optional[float], Optional[float]]:
     lat = row.get("lat") or row.get("latitude")
     lon = row.get("lon") or row.get("lng") or row.get("longitude")
     try:
@@ -142,6 +293,15 @@ def get_latlon(code_or_name: str) -> Tuple[Optional[float], Optional[float]]:
     except (ValueError, TypeError):
         return (None, None)
 
+def latlon_array() -> Tuple[List[str], array, array]:
+    """
+    Column-wise (iata_codes, lats, lons) for every airport with an IATA code and coordinates.
+    lats/lons are contiguous float64 arrays, so bulk distance code can wrap them without
+    copying (e.g. numpy.frombuffer(lats)) instead of calling get_latlon per airport.
+    """
+    _ensure_loaded()
+    return _latlon_columns
+
 def get_tz(code_or_name: str) -> Optional[str]:
     """
     Return IANA timezone name (e.g., 'Europe/Rome') for an airport/city/IATA/ICAO.
@@ -154,11 +314,13 @@ def get_tz(code_or_name: str) -> Optional[str]:
 
 __all__ = [
     "build_indexes",
+    "drop_cached_rows",
     "resolve",
     "to_iata",
     "to_icao",
     "to_names",
     "to_iata_by_name",
     "get_latlon",
+    "latlon_array",
     "get_tz",
 ]
\ No newline at end of file
@@ -1,21 +1,46 @@
 # common/canonical.py
+import calendar
 import hashlib
+import time
 from datetime import datetime, timezone
+from typing import Iterable, List, Tuple
 
 def floor_to_5min(ts_iso: str) -> str:
     """Return ts truncated to 5-minute buckets in ISO Z."""
     if not ts_iso:
         return ""
-    dt = datetime.fromisoformat(ts_iso.replace("Z", "+00:00")).astimezone(timezone.utc)
-    dt = dt.replace(second=0, microsecond=0)
-    minute = (dt.minute // 5) * 5
-    dt = dt.replace(minute=minute)
-    return dt.isoformat(timespec="seconds").replace("+00:00", "Z")
+    dt = datetime.fromisoformat(ts_iso.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.astimezone(timezone.utc)  # naive input is local time, as before
+    # floor on the epoch instead of re-building the datetime field by field
+    epoch = calendar.timegm(dt.utctimetuple())
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch - epoch % 300))
+
+def _canonical_key(o: str | None, d: str | None, t: str, a: str | None) -> bytes:
+    """Stored dedup key material; t is the already-floored departure (or "")."""
+    return f"{(o or '').strip().upper()}|{(d or '').strip().upper()}|{t}|{(a or '').strip().lower()}".encode("utf-8")
 
 def canonical_hash(origin_iata: str, destination_iata: str, departure_ts: str, aircraft: str | None) -> str:
-    o = (origin_iata or "").strip().upper()
-    d = (destination_iata or "").strip().upper()
     t = floor_to_5min(departure_ts) if departure_ts else ""
-    a = (aircraft or "").strip().lower()
-    key = "|".join([o, d, t, a])
-    return hashlib.sha1(key.encode("utf-8")).hexdigest()
\ No newline at end of file
+    return hashlib.sha1(_canonical_key(origin_iata, destination_iata, t, aircraft)).hexdigest()
+
+def canonical_hash_batch(
+    records: Iterable[Tuple[str, str, str, str | None]],
+) -> List[str]:
+    """canonical_hash for many (origin, destination, departure_ts, aircraft) tuples at once.
+
+    Same digests as calling canonical_hash per record; departure timestamps shared
+    between records (one scrape has many per slot) are floored only once.
+    """
+    floored: dict[str, str] = {}
+    sha1 = hashlib.sha1
+    out: List[str] = []
+    for o, d, ts, a in records:
+        if ts:
+            t = floored.get(ts)
+            if t is None:
+                t = floored[ts] = floor_to_5min(ts)
+        else:
+            t = ""
+        out.append(sha1(_canonical_key(o, d, t, a)).hexdigest())
+    return out
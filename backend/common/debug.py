@@ -1,8 +1,15 @@
 # backend/common/debug.py
 from __future__ import annotations
+import gzip
+import os
+import time
 from pathlib import Path
 from typing import List, Optional
 
+_CHUNK = 1 << 16
+# SCRAPER_DEBUG_GZIP=0 keeps HTML dumps as plain .html files
+_GZIP_HTML = os.getenv("SCRAPER_DEBUG_GZIP", "1") != "0"
+
 class DebugCollector:
     """
     Tiny helper to dump HTML and a plain-text report for a given provider.
@@ -10,15 +17,21 @@ class DebugCollector:
     """
     def __init__(self, provider_name: str, enabled: bool, outdir: Optional[str] = None):
         self.provider = provider_name
+        self._prefix = f"[{provider_name}] "
         self.enabled = bool(enabled)
         self.outdir = Path(outdir) if (enabled and outdir) else None
         self.lines: List[str] = []
+        self.saved: List[str] = []  # file names written to outdir this run
+        # outdir as a plain "dir/" prefix: per-save paths are one string concat, no Path objects
+        self._outdir_str = os.path.join(str(self.outdir), "") if self.outdir else ""
+        # providers share outdir and run concurrently: one report per provider and run
+        self.report_filename = f"{provider_name}_report_{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}.txt"
         if self.outdir:
             self.outdir.mkdir(parents=True, exist_ok=True)
 
     def add(self, line: str) -> None:
         if self.enabled:
-            self.lines.append(f"[{self.provider}] {line}")
+            self.lines.append(self._prefix + line)
 
     def log(self, key: str, value=None) -> None:
         """
@@ -39,9 +52,7 @@ class DebugCollector:
         """Write arbitrary text (HTML or plain) to a debug file in outdir."""
         if not (self.enabled and self.outdir):
             return
-        path = self.outdir / filename
-        path.write_text(text, encoding="utf-8")
-        print(f"🪵 DEBUG saved: {path}")
+        self._write(filename, text)
 
     def save(self, filename: str, text: str) -> None:
         """Backwards-compatible alias for save_text()."""
@@ -50,11 +61,39 @@ class DebugCollector:
     def save_html(self, filename: str, html: str) -> None:
         if not (self.enabled and self.outdir):
             return
-        path = self.outdir / filename
-        path.write_text(html, encoding="utf-8")
-        print(f"🪵 DEBUG saved: {path}")
+        self._write(filename, html)
+
+    def _write(self, filename: str, text: str) -> None:
+        if _GZIP_HTML and filename.endswith(".html"):
+            # page dumps compress ~7x even at level 1; read back with zcat/zless
+            filename += ".gz"
+            fp = gzip.open(self._outdir_str + filename, "wb", compresslevel=1)
+        else:
+            fp = open(self._outdir_str + filename, "wb")
+        # encode in 64 KiB slices so a multi-MB dump never holds a full bytes copy
+        with fp as f:
+            for i in range(0, len(text), _CHUNK):
+                f.write(text[i:i + _CHUNK].encode("utf-8"))
+        # announced once in close() instead of a flushed print per artifact
+        self.saved.append(filename)
+
+    def write_report(self, filename: Optional[str] = None) -> None:
+        if not (self.enabled and self.outdir):
+            return
+        filename = filename or self.report_filename
+        # stream the lines out instead of joining them into one big string first
+        with open(self._outdir_str + filename, "w", encoding="utf-8") as f:
+            f.writelines(f"{line}\n" for line in self.lines)
 
-    def write_report(self, filename: str = "report.txt") -> None:
+    def close(self, report_filename: Optional[str] = None) -> None:
+        """Write the report and print a single summary of everything saved this run."""
         if not (self.enabled and self.outdir):
             return
-        (self.outdir / filename).write_text("\n".join(self.lines) + "\n", encoding="utf-8")
\ No newline at end of file
+        report_filename = report_filename or self.report_filename
+        if self.lines:
+            self.write_report(report_filename)
+            self.saved.append(report_filename)
+        if self.saved:
+            print(f"🪵 DEBUG saved {len(self.saved)} file(s) to {self.outdir}: "
+                  + ", ".join(self.saved))
+        self.saved.clear()
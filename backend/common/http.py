@@ -15,6 +15,8 @@ from __future__ import annotations
 
 import os
 import time
+import functools
+import itertools
 import random
 import threading
 from typing import Dict, Optional, Mapping, Any
@@ -38,6 +40,9 @@ _USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0 Safari/537.36",
 ]
 
+_UA_ROTATE_EVERY = 5
+_req_counter = itertools.count(1)  # next() is atomic under the GIL
+
 _session: Optional[requests.Session] = None
 _session_lock = threading.Lock()
 
@@ -46,26 +51,47 @@ class _PerHostLimiter:
     """Simple per-host minimum delay to be polite."""
 
     def __init__(self, min_delay_ms: int) -> None:
-        self._min_delay = max(0.0, min_delay_ms / 1000.0)
+        # integer nanoseconds on the monotonic clock: immune to NTP/wall-clock jumps
+        self._min_delay_ns = max(0, int(min_delay_ms * 1_000_000))
         self._lock = threading.Lock()
-        self._last_ts: Dict[str, float] = {}
+        self._next_ok_ns: Dict[str, int] = {}
 
     def wait(self, host: str) -> None:
-        if not host or self._min_delay <= 0:
+        if not host or self._min_delay_ns <= 0:
             return
+        # Reserve this host's next slot under the lock, but sleep outside it so
+        # concurrent fetches (providers run in parallel threads) to other hosts are not held up.
         with self._lock:
-            now = time.time()
-            last = self._last_ts.get(host, 0.0)
-            to_sleep = self._min_delay - (now - last)
-            if to_sleep > 0:
+            now = time.monotonic_ns()
+            to_sleep_ns = self._next_ok_ns.get(host, now) - now
+            if to_sleep_ns > 0:
                 # add small jitter to avoid thundering herd
-                time.sleep(to_sleep + random.uniform(0, self._min_delay * 0.2))
-            self._last_ts[host] = time.time()
+                to_sleep_ns += random.randrange(self._min_delay_ns // 5 + 1)
+            else:
+                to_sleep_ns = 0
+            self._next_ok_ns[host] = now + to_sleep_ns + self._min_delay_ns
+        if to_sleep_ns > 0:
+            time.sleep(to_sleep_ns / 1e9)
 
 
 _limiter = _PerHostLimiter(_MIN_DELAY_MS)
 
 
+@functools.lru_cache(maxsize=4096)
+def _host_from_url(url: str) -> str:
+    """urlparse(url).netloc without building a SplitResult for the common scheme://host/... form."""
+    i = url.find("://")
+    if i < 0:
+        return urlparse(url).netloc
+    start = i + 3
+    end = len(url)
+    for ch in "/?#":
+        j = url.find(ch, start, end)
+        if j != -1:
+            end = j
+    return url[start:end]
+
+
 def _build_session() -> requests.Session:
     s = requests.Session()
     retries = Retry(
@@ -101,21 +127,18 @@ def get(
     headers: Optional[Mapping[str, str]] = None,
     timeout: Optional[float] = None,
 ) -> Response:
-    host = urlparse(url).netloc
-    _limiter.wait(host)
+    _limiter.wait(_host_from_url(url))
     s = get_session()
 
-    # Occasionally rotate UA on the shared session
-    if random.random() < 0.2:
-        s.headers.update({"User-Agent": random.choice(_USER_AGENTS)})
-
-    req_headers: Dict[str, str] = {}
-    if headers:
-        req_headers.update(headers)
-    if "User-Agent" not in req_headers:
-        req_headers["User-Agent"] = s.headers.get("User-Agent", _USER_AGENTS[0])
+    # Rotate the session UA round-robin on every 5th request; a counter is cheaper
+    # than an RNG call per request and spreads the UAs evenly.
+    i = next(_req_counter)
+    if i % _UA_ROTATE_EVERY == 0:
+        s.headers["User-Agent"] = _USER_AGENTS[(i // _UA_ROTATE_EVERY) % len(_USER_AGENTS)]
 
-    resp = s.get(url, params=params, headers=req_headers, timeout=timeout or _TIMEOUT_S)
+    # requests merges per-call headers over the session's (incl. its User-Agent),
+    # so pass the caller's mapping through instead of copying it per request
+    resp = s.get(url, params=params, headers=headers, timeout=timeout or _TIMEOUT_S)
     return resp
 
 
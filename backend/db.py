@@ -3,7 +3,6 @@ import sys
 import datetime as dt
 from typing import Optional
 
-from dateutil import parser as dtparser
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
@@ -35,6 +34,9 @@ def get_supabase() -> Client:
 
 
 def _iso_utc(dt_obj: dt.datetime) -> str:
+    # already UTC (or naive, which we treat as UTC) on a whole second: format directly
+    if (dt_obj.tzinfo is None or dt_obj.tzinfo is dt.timezone.utc) and not dt_obj.microsecond:
+        return dt_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
     if dt_obj.tzinfo is None:
         dt_obj = dt_obj.replace(tzinfo=dt.timezone.utc)
     return (
@@ -45,16 +47,17 @@ def _iso_utc(dt_obj: dt.datetime) -> str:
     )
 
 def _u(s: Optional[str]) -> Optional[str]:
-    return s.strip() if isinstance(s, str) and s.strip() else None
+    # strip once (not once to test and again to return)
+    if not isinstance(s, str):
+        return None
+    return s.strip() or None
 
 def _upper3(s: Optional[str]) -> Optional[str]:
-    s = _u(s)
-    return s.upper() if s else None
+    return (s.strip().upper() or None) if isinstance(s, str) else None
 
-_ALLOWED_CURRENCIES = {"EUR", "USD", "GBP"}
+_ALLOWED_CURRENCIES = {"EUR": "EUR", "USD": "USD", "GBP": "GBP"}
 def _norm_currency(c: Optional[str]) -> str:
-    c = (c or "EUR").upper()
-    return c if c in _ALLOWED_CURRENCIES else "EUR"
+    return _ALLOWED_CURRENCIES.get(c.upper(), "EUR") if c else "EUR"
 
 
 def _normalize_dep_arr(dep: Optional[str], arr: Optional[str]) -> tuple[Optional[str], Optional[str]]:
@@ -75,8 +78,17 @@ def _normalize_dep_arr(dep: Optional[str], arr: Optional[str]) -> tuple[Optional
     # Validate ordering (allow up to 24h duration)
     try:
         if dep and arr:
-            dep_dt = dtparser.isoparse(dep)
-            arr_dt = dtparser.isoparse(arr)
+            if len(dep) == len(arr) == 20 and dep[-1] == arr[-1] == "Z":
+                # canonical YYYY-MM-DDTHH:MM:SSZ sorts like the instant it names:
+                # an arrival not after departure needs no parsing at all
+                if arr <= dep:
+                    return dep, None
+                dep_dt = dt.datetime.fromisoformat(dep[:-1])
+                arr_dt = dt.datetime.fromisoformat(arr[:-1])
+            else:
+                # stdlib ISO parser (C) instead of dateutil; "Z" spelled out for Python < 3.11
+                dep_dt = dt.datetime.fromisoformat(dep.replace("Z", "+00:00"))
+                arr_dt = dt.datetime.fromisoformat(arr.replace("Z", "+00:00"))
             delta = (arr_dt - dep_dt).total_seconds()
             if delta <= 0 or delta > 24 * 3600:
                 arr = None
@@ -86,32 +98,31 @@ def _normalize_dep_arr(dep: Optional[str], arr: Optional[str]) -> tuple[Optional
     return dep, arr
 
 
+_PRICE_STRIP = str.maketrans("", "", ", ")  # thousands separators and spaces, one C pass
+
 def _coerce_price(p) -> Optional[float]:
     """Turn strings like '12,000' into 12000.0; negatives/zero -> None."""
     if p is None:
         return None
+    if type(p) is float:  # already numeric (most scraper output): skip the try/convert
+        return None if p <= 0 else p
     try:
-        if isinstance(p, str):
-            p = float(p.replace(",", "").replace(" ", ""))
-        p = float(p)
-        if p <= 0:
-            return None
-        return p
+        p = float(p.translate(_PRICE_STRIP)) if isinstance(p, str) else float(p)
     except Exception:
         return None
+    if p <= 0:
+        return None
+    return p
 
 
-def _norm_status(explicit: Optional[str], price_current) -> str:
+def _norm_status_from_price(price_current: Optional[float]) -> str:
     """
-    Map provider/explicit statuses to our 3-status model.
+    Map a record to our 3-status model from its already-coerced price.
     - If price_current is a positive number -> 'available'
     - Else -> 'pending'
     - We do NOT set 'unavailable' here; the refresh function handles that.
     """
-    pc = _coerce_price(price_current)
-    if pc is not None and pc > 0:
-        return "available"
-    return "pending"
+    return "available" if price_current is not None and price_current > 0 else "pending"
 
 
 def upsert_flight_and_snapshot(rec: FlightRecord) -> int:
@@ -127,10 +138,13 @@ def upsert_flight_and_snapshot(rec: FlightRecord) -> int:
     price_normal = _coerce_price(rec.get("price_normal"))
 
     # Normalize status to our 3-status model BEFORE writing
-    status_norm = _norm_status(rec.get("status"), price_current)
+    status_norm = _norm_status_from_price(price_current)
 
     origin_iata = _upper3(rec.get("origin_iata"))
     destination_iata = _upper3(rec.get("destination_iata"))
+    # used by both payloads: normalize once
+    currency = _norm_currency(rec.get("currency"))
+    link = _u(rec.get("link"))
 
     flight_payload = {
         "user_id": SYSTEM_USER_ID,
@@ -142,8 +156,8 @@ def upsert_flight_and_snapshot(rec: FlightRecord) -> int:
         "departure_ts": dep,
         "arrival_ts": arr,
         "aircraft": _u(rec.get("aircraft")),
-        "link": _u(rec.get("link")),
-        "currency": _norm_currency(rec.get("currency")),
+        "link": link,
+        "currency": currency,
         "status": status_norm,
         "probability": rec.get("probability"),
         "raw_static": rec.get("raw_static"),
@@ -164,9 +178,9 @@ def upsert_flight_and_snapshot(rec: FlightRecord) -> int:
         "flight_id": flight_id,
         "price_current": price_current,
         "price_normal": price_normal,
-        "currency": _norm_currency(rec.get("currency")),
+        "currency": currency,
         "status": status_norm,
-        "link": _u(rec.get("link")),
+        "link": link,
         "raw": rec.get("raw"),
     }
     supabase.table("flight_snapshots").insert(snap_payload).execute()
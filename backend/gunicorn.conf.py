@@ -0,0 +1,11 @@
+# backend/gunicorn.conf.py
+# Render start command:  gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# /api/flights is I/O-bound on Supabase; gevent lets one worker overlap hundreds of waits
+worker_class = "gevent"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "500"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
@@ -1,6 +1,23 @@
 # backend/providers/__init__.py
-from .globeair import GlobeAirProvider
+# Providers are imported lazily (PEP 562): importing the package, or one provider
+# module, does not pull in every other provider and its parsing dependencies.
+import importlib
+
+_LAZY = {
+    "GlobeAirProvider": ".globeair",
+}
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    obj = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = obj  # later lookups skip __getattr__
+    return obj
+
+def __dir__():
+    return sorted([*globals(), *_LAZY])
 
 __all__ = [
     "GlobeAirProvider",
-]
\ No newline at end of file
+]
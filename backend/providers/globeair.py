@@ -1,37 +1,67 @@
 # providers/globeair.py
 from __future__ import annotations
 
+import functools
 import re
+from itertools import islice
 from typing import List, Optional
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit, urlunsplit
 
+import soupsieve as sv
 from bs4 import BeautifulSoup
 
 from providers.base import Provider
 from common.http import get_text
 from common.types import FlightRecord
 
-from datetime import timezone
+from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
-from dateutil import parser as dtparser
 
 from common.airports import get_tz
 
 GLOBEAIR_URL = "https://www.globeair.com/empty-leg-flights"
 
+# lxml's C parser builds the tree several times faster than the pure-Python one
+try:
+    import lxml  # noqa: F401
+    _BS_PARSER = "lxml"
+except ImportError:
+    _BS_PARSER = "html.parser"
+
 RE_GA_TITLE = re.compile(r"^\s*(.+?)\s*\(([A-Z]{3})\)\s*→\s*(.+?)\s*\(([A-Z]{3})\)\s*$")
 RE_GA_TIME  = re.compile(r"^\s*([0-9: ]+[AP]M)\s*→\s*([0-9: ]+[AP]M)\s*$")
 RE_PCT      = re.compile(r"-?(\d+)%")
 RE_MONEY    = re.compile(r"(\d[\d.,]*)")
+# compiled once at import: select()/select_one() with a string re-resolves the CSS per call.
+# Single tag+class lookups use find()/find_all() instead, which bypass soupsieve.
+SEL_COLS        = sv.compile(".columns .column")
+SEL_BOOK        = sv.compile("a.button.is-primary, a.button.is-rounded.is-primary")
+SEL_STRIKE      = sv.compile("p.flightdata strike")
+SEL_STRONG      = sv.compile("p.flightdata strong")
+SEL_PROB        = sv.compile(".tags .tag.is-info")
+GA_DATETIME_FMT = "%B %d, %Y %I:%M %p"  # 'August 16, 2025 6:50 AM'
+# identical for every card: one shared dict instead of one per row (read-only downstream)
+_GA_RAW_STATIC = {"operator": "GlobeAir"}
+
+
+_MONEY_SYMBOLS = str.maketrans("", "", "€$£")
+_MONEY_CHARS = frozenset("0123456789.,")
 
 
 def _clean_money(text: Optional[str]):
     if not text:
         return None
-    m = RE_MONEY.search(text)
-    if not m:
-        return None
-    raw = m.group(1).replace(".", "").replace(",", "")
+    # usual case '€ 7,500': drop the symbol; if only digits/separators are left it
+    # is exactly what RE_MONEY would match, so skip the regex
+    s = text.translate(_MONEY_SYMBOLS).strip()
+    if s and s[0].isdigit() and _MONEY_CHARS.issuperset(s):
+        raw = s
+    else:
+        m = RE_MONEY.search(text)
+        if not m:
+            return None
+        raw = m.group(1)
+    raw = raw.replace(".", "").replace(",", "")
     try:
         return int(raw)
     except ValueError:
@@ -41,6 +71,7 @@ def _clean_money(text: Optional[str]):
             return None
 
 
+@functools.lru_cache(maxsize=2048)  # cards share dates/times; hits skip parsing entirely
 def _to_utc_iso(date_str: Optional[str], time_str: Optional[str], tz_name: Optional[str]) -> Optional[str]:
     """
     Convert local date+time (e.g. 'August 16, 2025' + '6:50 AM') in tz_name
@@ -49,7 +80,13 @@ def _to_utc_iso(date_str: Optional[str], time_str: Optional[str], tz_name: Optio
     if not (date_str and time_str and tz_name):
         return None
     try:
-        naive = dtparser.parse(f"{date_str} {time_str}")  # naive, calendar time
+        stamp = f"{date_str} {time_str}"
+        try:
+            naive = datetime.strptime(stamp, GA_DATETIME_FMT)  # naive, calendar time
+        except ValueError:
+            # anything off the usual card format; dateutil is only loaded if this ever happens
+            from dateutil import parser as dtparser
+            naive = dtparser.parse(stamp)
         try:
             tz = ZoneInfo(tz_name)  # can raise if tz_name invalid
         except Exception:
@@ -68,24 +105,27 @@ class GlobeAirProvider(Provider):
         super().__init__(debug=debug, debug_dir=debug_dir)
 
     def fetch_all(self) -> List[FlightRecord]:
-        html = get_text(GLOBEAIR_URL, headers={"Referer": self.base_url})
-        self.dbg.save_html("globeair.html", html)
-        self.dbg.add(f"fetched_bytes={len(html)}")
-        return self._parse(html)  # <-- this exists again
+        try:
+            html = get_text(GLOBEAIR_URL, headers={"Referer": self.base_url})
+            self.dbg.save_html("globeair.html", html)
+            self.dbg.add(f"fetched_bytes={len(html)}")
+            return self._parse(html)  # <-- this exists again
+        finally:
+            self.dbg.close()
 
     def _parse(self, html: str) -> List[FlightRecord]:
-        soup = BeautifulSoup(html, "html.parser")
-        cols = soup.select(".columns .column")
+        soup = BeautifulSoup(html, _BS_PARSER)
+        cols = SEL_COLS.select(soup)
         if not cols:
-            cols = soup.select("div.column")
+            cols = soup.find_all("div", class_="column")
         self.dbg.add(f"ga_cols={len(cols)}")
 
         rows: List[FlightRecord] = []
         seen_keys: set[tuple[str, str, str | None, str | None, str | None]] = set()
 
         for idx, col in enumerate(cols):
-            h3 = col.select_one("h3.caption")
-            p  = col.select_one("p.flightdata")
+            h3 = col.find("h3", class_="caption")
+            p  = col.find("p", class_="flightdata")
             if not h3 or not p:
                 if self.debug:
                     self.dbg.add(f"skip[{idx}]=no_caption_or_flightdata")
@@ -99,7 +139,8 @@ class GlobeAirProvider(Provider):
                 continue
             origin_name, origin_iata, dest_name, dest_iata = m.groups()
 
-            lines = [s.strip() for s in p.stripped_strings]
+            # stripped_strings is already stripped; only the first three lines are used
+            lines = list(islice(p.stripped_strings, 3))
             date_line = lines[0] if len(lines) > 0 else None
             time_line = lines[1] if len(lines) > 1 else None
             info_line = lines[2] if len(lines) > 2 else ""
@@ -123,17 +164,17 @@ class GlobeAirProvider(Provider):
             probability = None
             currency = "EUR"
 
-            book_btn = col.select_one("a.button.is-primary, a.button.is-rounded.is-primary")
+            book_btn = SEL_BOOK.select_one(col)
             if book_btn:
                 price_current = _clean_money(book_btn.get_text())
                 if price_current:
                     status = "available"
 
-            strike = col.select_one("p.flightdata strike")
+            strike = SEL_STRIKE.select_one(col)
             if strike:
                 price_normal = _clean_money(strike.get_text())
 
-            strong = col.select_one("p.flightdata strong")
+            strong = SEL_STRONG.select_one(col)
             if strong:
                 pm = RE_PCT.search(strong.get_text())
                 if pm:
@@ -145,7 +186,7 @@ class GlobeAirProvider(Provider):
             if "Flight not confirmed" in (info_line or ""):
                 status = "pending"
 
-            prob_span = col.select_one(".tags .tag.is-info")
+            prob_span = SEL_PROB.select_one(col)
             if prob_span:
                 pm2 = RE_PCT.search(prob_span.get_text())
                 if pm2:
@@ -155,7 +196,7 @@ class GlobeAirProvider(Provider):
                         probability = None
 
             link = None
-            a0 = col.select_one("a[href]")
+            a0 = col.find("a", href=True)
             if a0:
                 href = a0.get("href")
                 link = urljoin(self.base_url, href) if href else None
@@ -165,7 +206,6 @@ class GlobeAirProvider(Provider):
             link_key = None
             if link:
                 # keep only scheme+netloc+path; drop query/fragment
-                from urllib.parse import urlsplit, urlunsplit
                 s = urlsplit(link)
                 link_key = urlunsplit((s.scheme, s.netloc, s.path, "", ""))
 
@@ -198,7 +238,7 @@ class GlobeAirProvider(Provider):
                     "times": time_line,
                     "info": info_line,
                 },
-                "raw_static": {"operator": "GlobeAir"},
+                "raw_static": _GA_RAW_STATIC,
                 "aircraft": None,
             })
 
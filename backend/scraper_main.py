@@ -1,11 +1,12 @@
 import os
 import sys
 import argparse
-import json
+import orjson
 import time
 from datetime import datetime, timezone
 from pathlib import Path
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from common.airports import build_indexes
 
 # ensure local imports (db.py) work when running this file directly
@@ -23,12 +24,15 @@ from common.canonical import canonical_hash
 
 
 # ---------- helpers ----------
+_now_iso_cache: tuple[int, str] = (-1, "")
+
 def now_utc_iso() -> str:
-    return (
-        datetime.now(timezone.utc)
-        .isoformat(timespec="seconds")
-        .replace("+00:00", "Z")
-    )
+    # called per saved record; format each wall-clock second only once
+    global _now_iso_cache
+    sec = int(time.time())
+    if _now_iso_cache[0] != sec:
+        _now_iso_cache = (sec, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(sec)))
+    return _now_iso_cache[1]
 
 
 def parse_args() -> argparse.Namespace:
@@ -62,12 +66,22 @@ def run_provider(name: str, debug: bool, debug_dir: str | None) -> list[FlightRe
     raise ValueError(f"Unknown provider: {name}")
 
 
+def _run_provider_timed(name: str, debug: bool, debug_dir: str | None):
+    """run_provider for a worker thread: (records, error, seconds) instead of raising."""
+    p0 = time.time()
+    try:
+        return run_provider(name, debug=debug, debug_dir=debug_dir), None, time.time() - p0
+    except Exception as e:
+        return None, e, time.time() - p0
+
+
 def upsert_canonical(sb, record, price_eur, c_hash, provider_ref, system_user_id):
     """
     Insert/update the canonical flight row identified by canonical_hash.
     - Only writes stable fields (identity + static metadata).
     - Never writes live/derived fields (status, status_latest, price_eur, link_latest, last_seen_at).
     - Merges provider_refs without duplicates (by provider + provider id or link).
+    Returns the flight id (None if the upsert returned no row).
     """
     o = (record.get("origin_iata") or "").upper()
     d = (record.get("destination_iata") or "").upper()
@@ -104,6 +118,7 @@ def upsert_canonical(sb, record, price_eur, c_hash, provider_ref, system_user_id
 
         if update_payload:
             sb.table("flights").update(update_payload).eq("id", row["id"]).execute()
+        return row["id"]
 
     else:
         # Create the canonical row with only stable fields
@@ -121,7 +136,25 @@ def upsert_canonical(sb, record, price_eur, c_hash, provider_ref, system_user_id
             "provider_refs": [provider_ref],
         }
 
-        sb.table("flights").upsert(payload, on_conflict="canonical_hash").execute()
+        res = sb.table("flights").upsert(payload, on_conflict="canonical_hash").execute()
+        return res.data[0]["id"] if res.data else None
+
+SNAPSHOT_BATCH_SIZE = 500
+
+def insert_snapshots(sb, payloads: list[dict]) -> int:
+    """Insert snapshot rows in bulk (one round-trip per batch); returns rows inserted."""
+    inserted = 0
+    for i in range(0, len(payloads), SNAPSHOT_BATCH_SIZE):
+        batch = payloads[i:i + SNAPSHOT_BATCH_SIZE]
+        try:
+            res = sb.table("flight_snapshots").insert(batch).execute()  # no .select(...) here
+            if res.data:
+                inserted += len(res.data)
+            else:
+                print(f"⚠️ Snapshot insert returned no rows ({len(batch)} snapshots)", file=sys.stderr)
+        except Exception as e:
+            print(f"❌ Snapshot insert failed ({len(batch)} snapshots): {e}", file=sys.stderr)
+    return inserted
 
 def mark_stale(sb) -> None:
     try:
@@ -132,16 +165,14 @@ def mark_stale(sb) -> None:
 
 def dedupe_by_canonical(records: list[dict]) -> list[dict]:
     """Remove duplicates by canonical flight identity."""
-    from common.canonical import canonical_hash
+    from common.canonical import canonical_hash_batch
+    hashes = canonical_hash_batch(
+        (r.get("origin_iata"), r.get("destination_iata"), r.get("departure_ts"), r.get("aircraft"))
+        for r in records
+    )
     seen: set[str] = set()
     out: list[dict] = []
-    for r in records:
-        h = canonical_hash(
-            r.get("origin_iata"),
-            r.get("destination_iata"),
-            r.get("departure_ts"),
-            r.get("aircraft"),
-        )
+    for r, h in zip(records, hashes):
         if h in seen:
             continue
         seen.add(h)
@@ -187,14 +218,24 @@ def main():
     provider_counts: dict[str, int] = {}
     provider_raw_counts: dict[str, int] = {}
 
-    # fetch
-    for prov in providers:
-        try:
-            p0 = time.time()
-            recs = run_provider(prov, debug=debug, debug_dir=report_dir if debug else None)
-            raw_count = len(recs)
-            recs = dedupe_by_canonical(recs)
-            uniq_count = len(recs)
+    # fetch: providers are network-bound and hit different hosts, so run them
+    # concurrently; results are still consumed in provider order
+    with ThreadPoolExecutor(max_workers=len(providers)) as pool:
+        futures = {
+            prov: pool.submit(_run_provider_timed, prov, debug, report_dir if debug else None)
+            for prov in providers
+        }
+        for prov in providers:
+            recs, err, durations[prov] = futures[prov].result()
+            try:
+                if err is not None:
+                    raise err
+                raw_count = len(recs)
+                recs = dedupe_by_canonical(recs)
+                uniq_count = len(recs)
+            except Exception as e:
+                print(f"❌ {prov} fetch error: {e}", file=sys.stderr)
+                continue
 
             print(f"ℹ️  {prov.capitalize()}: {uniq_count} unique ({raw_count} raw)")
             provider_counts[prov] = uniq_count
@@ -205,11 +246,6 @@ def main():
                 st = str((r.get("status") or "")).lower() or "unknown"
                 parsed_status_counts[st] += 1
 
-            durations[prov] = time.time() - p0
-        except Exception as e:
-            print(f"❌ {prov} fetch error: {e}", file=sys.stderr)
-            durations[prov] = time.time() - p0
-
     print(f"ℹ️  Total {len(total_records)} unique Datapoints.")
 
     # write (unless dry-run)
@@ -220,6 +256,7 @@ def main():
         print("💡 Dry-run: keine Writes in die DB.")
     else:
         saved = 0
+        snap_payloads: list[dict] = []
         for r in total_records:
             try:
                 # canonical hash
@@ -245,24 +282,14 @@ def main():
                     "seen_at": now_utc_iso(),
                 }
 
-                # Canonical consolidation write
-                upsert_canonical(sb, r, price_eur, c_hash, provider_ref, SYSTEM_USER_ID)
+                # Canonical consolidation write (returns the row id, no re-select needed)
+                flight_id = upsert_canonical(sb, r, price_eur, c_hash, provider_ref, SYSTEM_USER_ID)
 
-                row = (
-                    sb.table("flights")
-                    .select("id")
-                    .eq("canonical_hash", c_hash)
-                    .limit(1)
-                    .execute()
-                    .data
-                )
-                if row:
-                    flight_id = row[0]["id"]
-
-                    # Insert snapshot matching your table schema
+                if flight_id is not None:
+                    # Snapshot matching your table schema; inserted in bulk after the loop
                     status_norm = "available" if (isinstance(price_eur, (int, float)) and price_eur > 0) else "pending"
 
-                    snap_payload = {
+                    snap_payloads.append({
                         "flight_id": flight_id,
                         "price_current": price_eur,   # may be None; OK
                         "price_normal": None,         # or coerce from r.get("price_normal")
@@ -270,20 +297,7 @@ def main():
                         "status": status_norm,
                         "link": provider_ref.get("link"),
                         "raw": r.get("raw"),
-                    }
-
-                    try:
-                        snap_res = (
-                            sb.table("flight_snapshots")
-                            .insert(snap_payload)   # no .select(...) here
-                            .execute()
-                        )
-                        if snap_res.data:
-                            snapshots_inserted += 1
-                        else:
-                            print(f"⚠️ Snapshot insert returned no rows (flight_id={flight_id})", file=sys.stderr)
-                    except Exception as e:
-                        print(f"❌ Snapshot insert failed (flight_id={flight_id}): {e}", file=sys.stderr)
+                    })
                 else:
                     print(f"⚠️ No canonical row found after upsert for hash={c_hash}", file=sys.stderr)
 
@@ -298,6 +312,8 @@ def main():
                 save_errors.append(msg)
                 print(f"❌ Fehler für {oc}→{dc}: {e}", file=sys.stderr)
 
+        snapshots_inserted = insert_snapshots(sb, snap_payloads)
+
     # Mark stale flights after all snapshots for this run are in
     if not args.dry_run:
         mark_stale(sb)
@@ -342,9 +358,10 @@ def main():
             "statuses": dict(statuses),
             "dry_run": args.dry_run,
         }
-        lines += ["", "JETCHECK_SUMMARY " + json.dumps(summary, separators=(",", ":"))]
+        lines += ["", "JETCHECK_SUMMARY " + orjson.dumps(summary).decode("utf-8")]
 
-        report_path.write_text("\n".join(lines), encoding="utf-8")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{line}\n" for line in lines)
         print(f"🧾 Debug report written: {report_path}")
     except Exception as e:
         print(f"⚠️  Failed to write final debug report: {e}", file=sys.stderr)
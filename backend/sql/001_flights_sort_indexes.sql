@@ -0,0 +1,14 @@
+-- backend/sql/001_flights_sort_indexes.sql
+-- Indexes backing the /api/flights sort + range queries on flights_public.
+-- Apply once in the Supabase SQL editor (idempotent); check the result with
+-- the Supabase performance advisor afterwards.
+
+-- default sort (sort_key=departure_ts) and date filters
+create index if not exists idx_flights_departure_ts
+    on public.flights (departure_ts);
+
+-- latest-snapshot lookup per flight (price_current in the view). status_latest and
+-- last_seen_at are columns on public.flights, kept current by the refresh/mark-stale
+-- functions (see upsert_canonical in scraper_main.py); 002 indexes those.
+create index if not exists idx_flight_snapshots_flight_id
+    on public.flight_snapshots (flight_id);
@@ -0,0 +1,18 @@
+-- backend/sql/002_flights_filter_indexes.sql
+-- Composite/partial indexes for the common /api/flights filter + sort shapes,
+-- so "route X→Y, upcoming first" and "available, newest first" become index
+-- range scans instead of sort + offset over the whole table. Idempotent.
+
+-- from/to filters with the default departure sort
+create index if not exists idx_flights_route_departure
+    on public.flights (origin_iata, destination_iata, departure_ts);
+
+-- status filter with the default departure sort (status_latest / last_seen_at are
+-- flights columns maintained by the refresh functions, not computed in the view)
+create index if not exists idx_flights_status_departure
+    on public.flights (status_latest, departure_ts);
+
+-- sort_key=last_seen_at&sort_dir=desc on the listing of bookable flights
+create index if not exists idx_flights_available_last_seen
+    on public.flights (last_seen_at desc nulls last)
+    where status_latest = 'available';
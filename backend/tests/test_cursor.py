@@ -0,0 +1,30 @@
+import base64
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "x" * 40)
+
+import app  # noqa: E402
+
+
+def _raw(s: str) -> str:
+    return base64.urlsafe_b64encode(s.encode("utf-8")).decode("ascii")
+
+
+def test_cursor_round_trip():
+    raw = app._encode_cursor("2025-08-16T09:12:00+00:00", 42)
+    assert app._decode_cursor(raw) == ("2025-08-16T09:12:00+00:00", "42")
+    assert app._decode_cursor(_raw("2025-08-16T09:12:00.5Z|7")) == ("2025-08-16T09:12:00.5Z", "7")
+
+
+def test_hostile_cursor_means_no_cursor():
+    for ts in ('2025-01-01"10:00:00', "2025-01-01 10:00:00", "2025-01-01T10:00:00",
+               "2025-01-01T10:00:00Z,id.gt.0", "2025-01-01T10:00:00)Z"):
+        assert app._decode_cursor(_raw(f"{ts}|5")) is None, ts
+    assert app._decode_cursor(_raw("2025-01-01T10:00:00Z|5;drop")) is None
+    assert app._decode_cursor("not-base64!") is None
+
+    filters = app._parse_filters("cursor=" + _raw('2025-01-01"10:00:00|5'))
+    assert filters.cursor is None
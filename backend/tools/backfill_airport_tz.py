@@ -1,8 +1,12 @@
 # tools/backfill_airport_tz.py
-import os, time, math
+import os, sys, time, math
 from supabase import create_client
 from timezonefinder import TimezoneFinder
 
+# backend/ on the path, so `python tools/backfill_airport_tz.py` can reach common/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.airports import drop_cached_rows
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
 
@@ -98,6 +102,9 @@ def main():
 
         time.sleep(SLEEP)
 
+    if total_updated:
+        # the local airports snapshot still has the old tz values
+        drop_cached_rows()
     print(f"✅ Done — updated tz for {total_updated} airports")
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+# backend/wsgi.py
+"""
+Production entrypoint (Render start command):
+
+  gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+
+(gevent workers, sized via WEB_CONCURRENCY / GUNICORN_WORKER_CONNECTIONS).
+
+gevent workers give cooperative concurrency, so slow Supabase calls no longer
+block unrelated requests. Sockets must be patched before supabase/httpx are
+imported, which is why the patch happens before importing the app.
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import sys, os  # noqa: E402
+sys.path.append(os.path.dirname(__file__))
+
+from app import app  # noqa: E402,F401